@@ -11,20 +11,74 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
-from datetime import datetime
-from typing import Annotated
-from pydantic import BaseModel
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Body
-from fastapi.responses import JSONResponse
+import asyncio
+import hashlib
+import multiprocessing
+import orjson
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Annotated, Optional
+from pydantic import BaseModel, ConfigDict, Field, WithJsonSchema, field_validator
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Body, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from backend.db import get_db
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import DuplicateKeyError
+from backend.db import get_db, close_connection, ensure_indexes
 from backend.utils.extract_text import extract_text_from_pdf
-from backend.utils.scoring import score_resume_with_llm, PROMPT_VERSION
+from backend.utils.scoring import (
+    LLM_ESCALATION_MODEL,
+    PROMPT_VERSION,
+    close_http_client,
+    get_cached_scoring_result,
+    load_token_encoding
+)
+from backend.utils.cache import close_redis
+from backend.utils.batching import start_score_batcher, stop_score_batcher, submit_score
+
+# Largest accepted upload (default: 20 MB)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+
+# Uvicorn worker processes. Unset means a single process (plain `uvicorn app:app`);
+# __main__ exports the count it starts so each worker sees it.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# Worker processes for CPU-bound PDF text extraction (keeps the event loop free).
+# Every web worker has its own pool, so the CPUs are split between them.
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)))
+# Start pool processes from a clean server process instead of forking this one,
+# which already runs Motor/pymongo background threads
+_PDF_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+# Created in startup_event: pool processes re-import this module, and must not
+# each build a pool of their own
+PDF_POOL: Optional[ProcessPoolExecutor] = None
+
+@dataclass(frozen=True)
+class Config:
+    """
+    LLM configuration resolved once at startup.
+    """
+    llm_provider: str
+    model_name: str
+    provider_name: str
+
+
+# Admission control for LLM scoring: requests beyond this many in flight get a 429
+MAX_INFLIGHT_SCORE = int(os.getenv("MAX_INFLIGHT_SCORE", "32"))
+SCORE_SEM = asyncio.Semaphore(MAX_INFLIGHT_SCORE)
+
+# Strong references to fire-and-forget writes so they are not garbage collected
+_background_tasks: set = set()
 
 app = FastAPI(
     title="Hirely API",
     description="Backend API for Hirely",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 
@@ -32,7 +86,7 @@ app = FastAPI(
 async def startup_event():
     """
     Verify required environment variables on startup.
-    Supports both local and cloud Ollama instances, and Groq.
+    Supports both local and cloud Ollama instances, Groq, and vLLM.
     """
     # Always required
     required_vars = {
@@ -46,6 +100,10 @@ async def startup_event():
         # Groq mode: require GROQ_API_KEY and GROQ_MODEL
         required_vars["GROQ_API_KEY"] = "Groq API key is required for Groq LLM provider"
         required_vars["GROQ_MODEL"] = "Groq model name is required for Groq LLM provider"
+    elif llm_provider == "vllm":
+        # vLLM mode: require VLLM_BASE_URL and VLLM_MODEL (VLLM_API_KEY is optional)
+        required_vars["VLLM_BASE_URL"] = "vLLM base URL is required for vLLM LLM provider"
+        required_vars["VLLM_MODEL"] = "vLLM model name is required for vLLM LLM provider"
     else:
         # Ollama mode: require OLLAMA_BASE_URL and OLLAMA_MODEL
         required_vars["OLLAMA_BASE_URL"] = "Ollama base URL is required for resume scoring"
@@ -79,6 +137,9 @@ async def startup_event():
     if llm_provider == "groq":
         groq_model = os.getenv("GROQ_MODEL")
         print(f"✓ LLM_PROVIDER=groq, GROQ_MODEL={groq_model}")
+    elif llm_provider == "vllm":
+        vllm_model = os.getenv("VLLM_MODEL")
+        print(f"✓ LLM_PROVIDER=vllm, VLLM_MODEL={vllm_model}")
     else:
         ollama_model = os.getenv("OLLAMA_MODEL")
         print(f"✓ LLM_PROVIDER=ollama, OLLAMA_MODEL={ollama_model}")
@@ -88,6 +149,11 @@ async def startup_event():
         groq_model = os.getenv("GROQ_MODEL")
         print("✓ Running in GROQ MODE")
         print(f"✓ Groq configured with model: {groq_model}")
+    elif llm_provider == "vllm":
+        vllm_base_url = os.getenv("VLLM_BASE_URL", "").strip()
+        vllm_model = os.getenv("VLLM_MODEL")
+        print("✓ Running in VLLM MODE (continuous batching)")
+        print(f"✓ vLLM configured: {vllm_base_url} with model {vllm_model}")
     else:
         ollama_base_url = os.getenv("OLLAMA_BASE_URL", "").strip()
         ollama_model = os.getenv("OLLAMA_MODEL")
@@ -98,19 +164,176 @@ async def startup_event():
             print("✓ Running in CLOUD OLLAMA MODE (API key authenticated)")
         print(f"✓ Ollama configured: {ollama_base_url} with model {ollama_model}")
     
+    # Resolve LLM configuration once so request handlers don't re-read the environment
+    if llm_provider == "groq":
+        app.state.config = Config(
+            llm_provider="groq",
+            model_name=os.getenv("GROQ_MODEL").strip(),
+            provider_name="Groq"
+        )
+    elif llm_provider == "vllm":
+        app.state.config = Config(
+            llm_provider="vllm",
+            model_name=os.getenv("VLLM_MODEL").strip(),
+            provider_name="vLLM"
+        )
+    else:
+        app.state.config = Config(
+            llm_provider="ollama",
+            model_name=os.getenv("OLLAMA_MODEL").strip(),
+            provider_name="Ollama"
+        )
+    
     db_name = os.getenv("DB_NAME", "hirely")
     print(f"✓ DB_NAME set to: {db_name}")
+    
+    # Create MongoDB indexes (non-fatal so the API can start while MongoDB is unreachable)
+    try:
+        await ensure_indexes()
+        print("✓ MongoDB indexes ensured")
+    except Exception as e:
+        print(f"⚠ Could not create MongoDB indexes: {str(e)}")
+    
+    # Start the PDF extraction worker pool
+    global PDF_POOL
+    PDF_POOL = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=_PDF_MP_CONTEXT)
+    print(f"✓ PDF extraction pool started ({PDF_WORKERS} workers)")
+    
+    # Load the tokenizer used for the resume token budget (may download; runs in a thread)
+    await load_token_encoding()
+    
+    # Start the /score micro-batching worker
+    await start_score_batcher()
+    print("✓ Score batcher started")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Stop background workers and release connections on shutdown.
+    """
+    await stop_score_batcher()
+    if PDF_POOL is not None:
+        PDF_POOL.shutdown(wait=False, cancel_futures=True)
+    # Let pending background writes finish before closing the MongoDB client
+    if _background_tasks:
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+    await close_http_client()
+    await close_redis()
+    await close_connection()
+
+
+def _log_background_error(task: asyncio.Task):
+    """
+    Report failures of fire-and-forget tasks, which would otherwise go unnoticed.
+    """
+    if not task.cancelled() and task.exception():
+        print(f"⚠ Background task failed: {task.exception()}")
+
+
+def spawn_background(coro) -> asyncio.Task:
+    """
+    Run a coroutine off the request's critical path.
+    
+    Args:
+        coro: Coroutine to schedule (typically a MongoDB write)
+        
+    Returns:
+        asyncio.Task: The scheduled task
+    """
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    task.add_done_callback(_log_background_error)
+    return task
+
+
+async def _insert_score_cache(score_cache, entry: dict):
+    """
+    Insert a score cache entry, ignoring races with concurrent identical requests.
+    """
+    try:
+        await score_cache.insert_one(entry)
+    except DuplicateKeyError:
+        pass
 
 
 @app.get("/")
 async def root():
     return {"status": "Hirely backend running"}
 
+
+def _upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum upload size is {MAX_UPLOAD_BYTES} bytes."
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized uploads from the Content-Length header, before the body is read,
+    and stop chunked uploads (no Content-Length) as soon as the body passes the cap.
+    Plain ASGI middleware: every other path is passed straight through, without
+    the per-request overhead of BaseHTTPMiddleware.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == "/upload":
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > MAX_UPLOAD_BYTES:
+                        response = ORJSONResponse(
+                            status_code=413,
+                            content={"detail": f"File too large. Maximum upload size is {MAX_UPLOAD_BYTES} bytes."}
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+            receive = self._limit_body(receive)
+        await self.app(scope, receive, send)
+    
+    @staticmethod
+    def _limit_body(receive):
+        """
+        Wrap receive so it raises a 413 once more than MAX_UPLOAD_BYTES has arrived.
+        Raised as an HTTPException, which FastAPI passes through form parsing and
+        renders as the response.
+        """
+        received = 0
+    
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > MAX_UPLOAD_BYTES:
+                    raise _upload_too_large()
+            return message
+    
+        return limited_receive
+
+
+app.add_middleware(UploadSizeLimitMiddleware)
+
+
+# Allowed frontend origins (comma-separated), e.g.
+# CORS_ORIGINS=http://localhost:3000,https://hirely.example.com
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000").split(",")
+    if origin.strip()
+]
+
 # Add CORS middleware to allow frontend to connect
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],   # allow ALL origins (MVP / demo safe)
-    allow_credentials=True,
+    allow_origins=CORS_ORIGINS,
+    # Browsers reject credentialed requests when the allowed origin is a wildcard
+    allow_credentials="*" not in CORS_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -118,9 +341,37 @@ app.add_middleware(
 
 # Request model for /score endpoint
 class ScoreRequest(BaseModel):
-    document_id: str
-    company: str
-    role: str
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
+    # Documented as a plain string in the OpenAPI schema
+    document_id: Annotated[ObjectId, WithJsonSchema({"type": "string"})]
+    company: str = Field(min_length=1)
+    role: str = Field(min_length=1)
+    
+    @field_validator("company", "role", mode="before")
+    @classmethod
+    def strip_whitespace(cls, value):
+        """
+        Normalize string inputs once, before any other validation.
+        """
+        return value.strip() if isinstance(value, str) else value
+    
+    @field_validator("document_id", mode="before")
+    @classmethod
+    def parse_document_id(cls, value):
+        """
+        Parse document_id into an ObjectId when the request is validated.
+        """
+        if isinstance(value, ObjectId):
+            return value
+        # ObjectId(None) would generate a fresh random id, so only strings are parsed
+        if not isinstance(value, str):
+            raise ValueError(f"Invalid document_id format: {value}")
+        value = value.strip()
+        try:
+            return ObjectId(value)
+        except InvalidId:
+            raise ValueError(f"Invalid document_id format: {value}")
 
 
 
@@ -157,7 +408,7 @@ async def upload_resume(
         company: Name of the company the resume is for
         
     Returns:
-        JSONResponse: Confirmation response with upload details
+        dict: Confirmation response with upload details
     """
     # Validate file type
     if not file.filename:
@@ -177,11 +428,20 @@ async def upload_resume(
         )
     
     try:
-        # Read file content
-        file_content = await file.read()
+        # Starlette has already spooled the upload (memory, then disk), so its
+        # size is known before anything is read into memory
+        if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+            raise _upload_too_large()
+        # Read it once, at most one byte past the cap, so the limit holds even
+        # when the size is unknown
+        pdf_bytes = await file.read(MAX_UPLOAD_BYTES + 1)
+        if len(pdf_bytes) > MAX_UPLOAD_BYTES:
+            raise _upload_too_large()
         
-        # Extract text from PDF (excluding metadata)
-        extracted_text = extract_text_from_pdf(file_content)
+        # Extract text from PDF (excluding metadata) in a worker process
+        extracted_text = await asyncio.get_running_loop().run_in_executor(
+            PDF_POOL, extract_text_from_pdf, pdf_bytes
+        )
         
         # Get database and collection
         db = await get_db()
@@ -192,25 +452,24 @@ async def upload_resume(
             "company": company.strip(),
             "filename": file.filename,
             "text": extracted_text,
-            "uploaded_at": datetime.utcnow().isoformat()
+            "uploaded_at": datetime.now(timezone.utc)
         }
         
         # Insert document into MongoDB (async)
         result = await resumes_collection.insert_one(resume_document)
         
         # Return success response
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "message": "Resume uploaded and stored successfully",
-                "document_id": str(result.inserted_id),
-                "company": company.strip(),
-                "filename": file.filename,
-                "uploaded_at": resume_document["uploaded_at"]
-            }
-        )
+        return {
+            "success": True,
+            "message": "Resume uploaded and stored successfully",
+            "document_id": str(result.inserted_id),
+            "company": company.strip(),
+            "filename": file.filename,
+            "uploaded_at": resume_document["uploaded_at"]
+        }
         
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -221,18 +480,32 @@ async def upload_resume(
 
 
 @app.get("/resumes")
-async def get_resumes():
+async def get_resumes(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500)
+):
     """
-    Get all resumes from MongoDB.
-    Returns a list of all uploaded resumes (without the full text content).
+    Get a page of resumes from MongoDB, newest first.
+    Returns uploaded resumes (without the full text content).
+    
+    Args:
+        skip: Number of resumes to skip
+        limit: Maximum number of resumes to return
     """
     try:
         db = await get_db()
         resumes_collection = db.resumes
         
-        # Get all resumes (exclude the full text for listing)
-        cursor = resumes_collection.find({}, {"text": 0})  # Exclude text field
-        resumes = await cursor.to_list(length=100)
+        # Get a page of resumes, newest first (exclude the full text for listing).
+        # The sort is total (_id breaks ties), so pages never repeat or skip documents.
+        cursor = (
+            resumes_collection.find({}, {"text": 0})
+            .sort([("uploaded_at", -1), ("_id", -1)])
+            .skip(skip)
+            .limit(limit)
+            .batch_size(50)
+        )
+        resumes = await cursor.to_list(length=limit)
         
         # Convert ObjectId to string
         for resume in resumes:
@@ -241,6 +514,8 @@ async def get_resumes():
         return {
             "success": True,
             "count": len(resumes),
+            "skip": skip,
+            "limit": limit,
             "resumes": resumes
         }
     except Exception as e:
@@ -257,9 +532,6 @@ async def get_resume(resume_id: str):
     Returns the full resume including extracted text.
     """
     try:
-        from bson import ObjectId
-        from bson.errors import InvalidId
-        
         db = await get_db()
         resumes_collection = db.resumes
         
@@ -290,15 +562,17 @@ async def get_resume(resume_id: str):
 async def view_data():
     """
     View all uploaded documents in MongoDB.
-    Returns all documents from the resumes collection.
+    Streams all documents from the resumes collection as JSON lines,
+    so memory use stays constant regardless of collection size.
     """
     db = await get_db()
-    cursor = db.resumes.find()
-    data = []
-    async for doc in cursor:
-        doc["_id"] = str(doc["_id"])
-        data.append(doc)
-    return data
+    
+    async def stream():
+        async for doc in db.resumes.find():
+            doc["_id"] = str(doc["_id"])
+            yield orjson.dumps(doc, default=str) + b"\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 @app.post("/score")
@@ -310,35 +584,22 @@ async def score_resume(score_request: ScoreRequest = Body(...)):
         score_request: JSON body with document_id, company, and role
         
     Returns:
-        JSONResponse: Scoring result matching the required schema
+        dict: Scoring result matching the required schema
         
     Raises:
-        HTTPException: 400 for invalid input, 404 for missing resume, 502 for LLM errors
+        HTTPException: 404 for missing resume, 429 when overloaded, 502 for LLM errors
     """
-    from bson import ObjectId
-    from bson.errors import InvalidId
-    
-    # Validate input
-    if not score_request.document_id or not score_request.document_id.strip():
-        raise HTTPException(status_code=400, detail="document_id is required")
-    if not score_request.company or not score_request.company.strip():
-        raise HTTPException(status_code=400, detail="company is required")
-    if not score_request.role or not score_request.role.strip():
-        raise HTTPException(status_code=400, detail="role is required")
-    
+    # Input is validated and normalized by ScoreRequest
     try:
         # Get database
         db = await get_db()
         resumes_collection = db.resumes
         
         # Fetch resume document from MongoDB
-        try:
-            resume_doc = await resumes_collection.find_one({"_id": ObjectId(score_request.document_id)})
-        except InvalidId:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid document_id format: {score_request.document_id}"
-            )
+        resume_doc = await resumes_collection.find_one(
+            {"_id": score_request.document_id},
+            {"text": 1, "_id": 0}
+        )
         
         if not resume_doc:
             raise HTTPException(
@@ -354,13 +615,48 @@ async def score_resume(score_request: ScoreRequest = Body(...)):
                 detail=f"Resume text not found for document_id: {score_request.document_id}. The resume may not have been processed correctly."
             )
         
+        company = score_request.company
+        role = score_request.role
+        
+        # Check the score cache before calling the LLM. Results are only reused
+        # for the same provider and models, so switching either rescores.
+        score_cache = db.score_cache
+        cache_key = hashlib.sha256(resume_text.encode()).hexdigest()
+        cache_query = {
+            "key": cache_key,
+            "company": company,
+            "role": role,
+            "prompt_version": PROMPT_VERSION,
+            "provider": app.state.config.llm_provider,
+            "model": app.state.config.model_name,
+            "escalation_model": LLM_ESCALATION_MODEL
+        }
+        cached = await score_cache.find_one(cache_query, {"result": 1, "_id": 0})
+        if cached:
+            scoring_result = cached["result"]
+        else:
+            # Then the scorer's exact-match cache (in-process, then Redis), so
+            # results it already holds are served even when scoring is saturated
+            scoring_result = await get_cached_scoring_result(resume_text, company, role)
+        
+        # Shed load with a fast 429 instead of queueing LLM calls without bound
+        # (no await between this check and acquiring the semaphore below)
+        if scoring_result is None and SCORE_SEM.locked():
+            raise HTTPException(
+                status_code=429,
+                detail="Too many scoring requests in progress. Please retry shortly.",
+                headers={"Retry-After": "2"}
+            )
+        
         # Score the resume using LLM
         try:
-            scoring_result = await score_resume_with_llm(
-                resume_text=resume_text,
-                company=score_request.company.strip(),
-                role=score_request.role.strip()
-            )
+            if scoring_result is None:
+                async with SCORE_SEM:
+                    scoring_result = await submit_score(
+                        resume_text=resume_text,
+                        company=company,
+                        role=role
+                    )
         except ValueError as e:
             # JSON parsing errors or validation errors
             error_msg = str(e)
@@ -371,10 +667,10 @@ async def score_resume(score_request: ScoreRequest = Body(...)):
                 )
             else:
                 # Check if it's a missing env var error
-                if "OLLAMA_API_KEY" in error_msg or "OLLAMA_BASE_URL" in error_msg or "OLLAMA_MODEL" in error_msg:
+                if "environment variable" in error_msg:
                     raise HTTPException(
                         status_code=500,
-                        detail=f"Ollama configuration error: {error_msg}. Please check environment variables."
+                        detail=f"{app.state.config.provider_name} configuration error: {error_msg}. Please check environment variables."
                     )
                 raise HTTPException(status_code=500, detail=f"Scoring validation error: {error_msg}")
         except Exception as e:
@@ -384,6 +680,18 @@ async def score_resume(score_request: ScoreRequest = Body(...)):
                 detail=f"LLM scoring error: {error_msg}"
             )
         
+        # Cache the fresh result in the background
+        if not cached:
+            spawn_background(_insert_score_cache(score_cache, {
+                **cache_query,
+                "result": scoring_result,
+                "scored_at": datetime.now(timezone.utc)
+            }))
+        
+        # The model that actually produced the result (it differs from the configured
+        # one when scoring escalated); entries cached before this was recorded lack it
+        model_name = scoring_result.get("model", app.state.config.model_name)
+        
         # Store scoring result in MongoDB
         ai_score_data = {
             "overall_score": scoring_result["overall_score"],
@@ -393,25 +701,23 @@ async def score_resume(score_request: ScoreRequest = Body(...)):
             "top_fixes": scoring_result["top_fixes"],
             "section_feedback": scoring_result["section_feedback"],
             "notes": scoring_result["notes"],
-            "model": os.getenv("OLLAMA_MODEL"),
-            "provider": "ollama",
+            "model": model_name,
+            "provider": app.state.config.llm_provider,
             "prompt_version": PROMPT_VERSION,
-            "scored_at": datetime.utcnow().isoformat(),
-            "company": score_request.company.strip(),
-            "role": score_request.role.strip()
+            "scored_at": datetime.now(timezone.utc),
+            "company": company,
+            "role": role
         }
         
-        # Update the resume document with scoring results
-        await resumes_collection.update_one(
-            {"_id": ObjectId(score_request.document_id)},
-            {"$set": {"ai_score": ai_score_data}}
-        )
+        # Update the resume document with scoring results without delaying the response
+        spawn_background(resumes_collection.update_one(
+            {"_id": score_request.document_id},
+            # Set individual subfields so MongoDB can apply an in-place delta update
+            {"$set": {f"ai_score.{field}": value for field, value in ai_score_data.items()}}
+        ))
         
-        # Return the scoring result
-        return JSONResponse(
-            status_code=200,
-            content=scoring_result
-        )
+        # Return the scoring result (the schema fields only)
+        return {field: value for field, value in scoring_result.items() if field != "model"}
         
     except HTTPException:
         raise
@@ -426,4 +732,15 @@ if __name__ == "__main__":
     import os
     import uvicorn
     port = int(os.getenv("PORT", 8080))
-    uvicorn.run("backend.app:app", host="0.0.0.0", port=port)
+    workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    # Worker processes import the app afresh and size their PDF pools from this
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    uvicorn.run(
+        "backend.app:app",
+        host="0.0.0.0",
+        port=port,
+        # uvloop is not available on Windows
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
+        workers=workers
+    )
@@ -5,11 +5,15 @@ Note: Environment variables are loaded in app.py before this module is imported.
 import os
 import certifi
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure
 
 # MongoDB connection configuration
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
 DB_NAME = os.getenv("DB_NAME", "hirely")
 
+# Cached scoring results expire after this many seconds (default: 30 days)
+SCORE_CACHE_TTL_SECONDS = int(os.getenv("SCORE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
 # Global client instance
 client: AsyncIOMotorClient = None
 
@@ -28,6 +32,37 @@ async def get_db():
     return client[DB_NAME]
 
 
+async def ensure_indexes():
+    """
+    Create the indexes the application relies on. Safe to call repeatedly.
+    """
+    db = await get_db()
+    
+    # Resumes: newest-first listing (_id breaks ties so pages are stable) and
+    # date-range queries on native BSON dates
+    await db.resumes.create_index([("uploaded_at", -1), ("_id", -1)])
+    # Resumes: per-company listing, newest first
+    await db.resumes.create_index([("company", 1), ("uploaded_at", -1)])
+    
+    # Score cache: one entry per (resume hash, company, role, prompt version,
+    # provider, model, escalation model)
+    await db.score_cache.create_index(
+        [
+            ("key", 1), ("company", 1), ("role", 1), ("prompt_version", 1),
+            ("provider", 1), ("model", 1), ("escalation_model", 1)
+        ],
+        unique=True
+    )
+    # The previous unique index (without provider and models) would reject the
+    # same resume scored by another model
+    try:
+        await db.score_cache.drop_index("key_1_company_1_role_1_prompt_version_1")
+    except OperationFailure:
+        pass
+    # TTL index evicts stale cache entries
+    await db.score_cache.create_index("scored_at", expireAfterSeconds=SCORE_CACHE_TTL_SECONDS)
+
+
 async def close_connection():
     """
     Close MongoDB connection.
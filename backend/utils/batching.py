@@ -0,0 +1,230 @@
+"""
+Micro-batching aggregator for resume scoring requests.
+Collects concurrent /score calls and dispatches them to the LLM provider together.
+"""
+import asyncio
+import os
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from backend.utils.scoring import score_resume_with_llm
+
+# Batching configuration
+BATCH_MAX = int(os.getenv("BATCH_MAX", "32"))
+BATCH_WAIT_MS = int(os.getenv("BATCH_WAIT_MS", "25"))
+
+# Requests are binned by resume length (<2k, 2-4k, 4-6k, 6k+ characters) so a
+# batch is not held up by one much longer prefill than the rest
+LENGTH_BIN_CHARS = 2048
+NUM_LENGTH_BINS = 4
+
+
+class RequestBatcher:
+    """
+    Background queue that groups submitted requests into batches.
+
+    A batch is flushed when its bin reaches max_batch_size requests or its
+    oldest request has waited batch_interval seconds, and is handed to
+    batch_handler in the background while the next batch is collected.
+    batch_handler returns one result (or exception) per request, in order.
+    """
+
+    def __init__(
+        self,
+        batch_handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = BATCH_MAX,
+        batch_interval: float = BATCH_WAIT_MS / 1000,
+        bin_of: Optional[Callable[[Any], int]] = None,
+        num_bins: int = 1
+    ):
+        self.batch_handler = batch_handler
+        self.max_batch_size = max_batch_size
+        self.batch_interval = batch_interval
+        self.bin_of = bin_of or (lambda request: 0)
+        # (request, future) items waiting to be binned
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Bins of (arrival_time, (request, future)) pairs, oldest first
+        self._bins: List[deque] = [deque() for _ in range(num_bins)]
+        # Strong references to in-flight batches so they are not garbage collected
+        self._dispatch_tasks: set = set()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """
+        Start the background loop.
+        Must be called from within the running event loop (e.g. the startup event).
+        """
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        """
+        Stop the background loop and fail any requests not yet dispatched.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for task in list(self._dispatch_tasks):
+            task.cancel()
+
+        # Fail requests that were binned or queued but never dispatched
+        pending = [item for request_bin in self._bins for _, item in request_bin]
+        for request_bin in self._bins:
+            request_bin.clear()
+        if self._queue is not None:
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            self._queue = None
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Scoring service is shutting down"))
+
+    def submit(self, request: Any) -> asyncio.Future:
+        """
+        Queue a request for the next batch.
+
+        Args:
+            request: Item passed to batch_handler
+
+        Returns:
+            asyncio.Future: Resolves to the request's result (await it)
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((request, future))
+        return future
+
+    async def _run_loop(self):
+        """
+        Sort queued requests into bins and flush each bin when it is full or due.
+        """
+        loop = asyncio.get_running_loop()
+        bins = self._bins
+
+        while True:
+            # Sleep until a new request arrives or the oldest pending item is due
+            oldest = [request_bin[0][0] for request_bin in bins if request_bin]
+            timeout = max(0.0, min(oldest) + self.batch_interval - loop.time()) if oldest else None
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                item = None
+
+            if item is not None:
+                request_bin = bins[self.bin_of(item[0])]
+                request_bin.append((loop.time(), item))
+                if len(request_bin) >= self.max_batch_size:
+                    self._flush(request_bin)
+
+            now = loop.time()
+            for request_bin in bins:
+                if request_bin and now - request_bin[0][0] >= self.batch_interval:
+                    self._flush(request_bin)
+
+    def _flush(self, request_bin: deque):
+        """
+        Empty a bin and dispatch its items as one batch in the background,
+        so the loop keeps collecting the next batch.
+        """
+        batch = [item for _, item in request_bin]
+        request_bin.clear()
+        task = asyncio.create_task(self._dispatch(batch))
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """
+        Run the batch handler and fan results back to the waiting futures.
+        """
+        try:
+            results = await self.batch_handler([request for request, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            # The caller may have disconnected and cancelled its future
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+async def _score_batch(batch: List[Tuple[str, str, str]]) -> List[Any]:
+    """
+    Score a micro-batch of (resume_text, company, role) requests concurrently.
+    Requests are issued grouped by (company, role) so those sharing a prompt
+    prefix reach the provider back-to-back and can reuse its prefix cache.
+    """
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for index, (_, company, role) in enumerate(batch):
+        groups.setdefault((company, role), []).append(index)
+    order = [index for indexes in groups.values() for index in indexes]
+
+    ordered_results = await asyncio.gather(
+        *(
+            score_resume_with_llm(resume_text=batch[i][0], company=batch[i][1], role=batch[i][2])
+            for i in order
+        ),
+        return_exceptions=True
+    )
+
+    results: List[Any] = [None] * len(batch)
+    for index, result in zip(order, ordered_results):
+        results[index] = result
+    return results
+
+
+_score_batcher = RequestBatcher(
+    _score_batch,
+    bin_of=lambda request: min(len(request[0]) // LENGTH_BIN_CHARS, NUM_LENGTH_BINS - 1),
+    num_bins=NUM_LENGTH_BINS
+)
+
+
+async def start_score_batcher():
+    """
+    Start the background worker that drains the scoring queue.
+    Must be called from within the running event loop (e.g. the startup event).
+    """
+    _score_batcher.start()
+
+
+async def stop_score_batcher():
+    """
+    Stop the background worker and fail any requests still waiting in the queue.
+    """
+    await _score_batcher.stop()
+
+
+async def submit_score(resume_text: str, company: str, role: str) -> Dict[str, Any]:
+    """
+    Queue a resume for scoring and wait for its result.
+
+    Args:
+        resume_text: The resume text content
+        company: Company name
+        role: Target role/job title
+
+    Returns:
+        Dict: Validated scoring result matching the schema, plus the "model"
+            that produced it
+
+    Raises:
+        ValueError: Propagated from score_resume_with_llm
+    """
+    if not _score_batcher.running:
+        # Batcher not running (e.g. module used outside the app): score directly
+        return await score_resume_with_llm(resume_text=resume_text, company=company, role=role)
+
+    return await _score_batcher.submit((resume_text, company, role))
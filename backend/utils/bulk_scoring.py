@@ -0,0 +1,183 @@
+"""
+Bulk resume scoring for offline pipelines.
+score_resumes_concurrent fans out real-time requests with bounded concurrency;
+score_resumes_batch uses the Groq Batch API, which trades a completion window of
+up to 24h for lower cost and higher throughput.
+"""
+import os
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import httpx
+import orjson
+from aiolimiter import AsyncLimiter
+
+from backend.utils.scoring import (
+    GROQ_API_KEY,
+    SCORING_SYSTEM_PROMPT,
+    build_groq_payload,
+    build_scoring_prompt,
+    clean_json_response,
+    get_http_client,
+    parse_scoring_result,
+    score_resume_with_llm,
+)
+
+GROQ_API_BASE = "https://api.groq.com/openai/v1"
+
+# Seconds between batch status checks
+BATCH_POLL_SECONDS = float(os.getenv("BATCH_POLL_SECONDS", "30"))
+BATCH_COMPLETION_WINDOW = os.getenv("BATCH_COMPLETION_WINDOW", "24h")
+
+# Batch states after which no more output will be produced
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+async def score_resumes_concurrent(
+    items: List[Tuple[str, str, str]],
+    concurrency: int = 16,
+    max_rate: Optional[float] = None
+) -> List[Union[Dict[str, Any], BaseException]]:
+    """
+    Score many resumes in real time with bounded parallelism.
+    Wall-clock time drops from N calls in sequence to about N / concurrency.
+
+    Args:
+        items: (resume_text, company, role) tuples
+        concurrency: Maximum number of requests in flight at once
+        max_rate: Optional cap on requests started per second, to stay within
+            the provider's rate limit
+
+    Returns:
+        List: One entry per item, in order - the validated scoring result, or
+            the exception raised for that item
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = AsyncLimiter(max_rate, 1.0) if max_rate else None
+
+    async def score_one(item: Tuple[str, str, str]) -> Dict[str, Any]:
+        async with semaphore:
+            if limiter is not None:
+                await limiter.acquire()
+            resume_text, company, role = item
+            return await score_resume_with_llm(resume_text, company, role)
+
+    # return_exceptions so one failed item (e.g. a 429) doesn't sink the rest
+    return await asyncio.gather(*(score_one(item) for item in items), return_exceptions=True)
+
+
+async def score_resumes_batch(
+    items: List[Tuple[str, str, str]]
+) -> List[Union[Dict[str, Any], ValueError]]:
+    """
+    Score many resumes through the Groq Batch API.
+    Waits (polling every BATCH_POLL_SECONDS) until the batch finishes.
+
+    Args:
+        items: (resume_text, company, role) tuples
+
+    Returns:
+        List: One entry per item, in order - the validated scoring result, or a
+            ValueError describing why that item could not be scored
+
+    Raises:
+        ValueError: If the batch cannot be submitted or fails as a whole
+    """
+    if not GROQ_API_KEY:
+        raise ValueError("GROQ_API_KEY environment variable is not set")
+    if not items:
+        return []
+
+    client = await get_http_client()
+    auth_headers = {"Authorization": f"Bearer {GROQ_API_KEY}"}
+
+    # One JSONL request line per resume, matched back up by custom_id
+    lines = []
+    for i, (resume_text, company, role) in enumerate(items):
+        prompt = build_scoring_prompt(resume_text, company, role)
+        lines.append(orjson.dumps({
+            "custom_id": f"req-{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": build_groq_payload(prompt, SCORING_SYSTEM_PROMPT)
+        }))
+    batch_file = b"\n".join(lines)
+
+    try:
+        # Upload the input file
+        response = await client.post(
+            f"{GROQ_API_BASE}/files",
+            headers=auth_headers,
+            data={"purpose": "batch"},
+            files={"file": ("batch.jsonl", batch_file, "application/jsonl")}
+        )
+        response.raise_for_status()
+        input_file_id = response.json()["id"]
+
+        # Create the batch
+        response = await client.post(
+            f"{GROQ_API_BASE}/batches",
+            headers=auth_headers,
+            json={
+                "input_file_id": input_file_id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": BATCH_COMPLETION_WINDOW
+            }
+        )
+        response.raise_for_status()
+        batch = response.json()
+
+        # Poll until the batch reaches a terminal state
+        while batch["status"] not in _TERMINAL_STATUSES:
+            await asyncio.sleep(BATCH_POLL_SECONDS)
+            response = await client.get(f"{GROQ_API_BASE}/batches/{batch['id']}", headers=auth_headers)
+            response.raise_for_status()
+            batch = response.json()
+
+        # Expired batches may still have partial output
+        output_file_id = batch.get("output_file_id")
+        if not output_file_id:
+            raise ValueError(f"Groq batch {batch['id']} ended with status {batch['status']} and no output: {batch.get('errors')}")
+
+        response = await client.get(f"{GROQ_API_BASE}/files/{output_file_id}/content", headers=auth_headers)
+        response.raise_for_status()
+        output = response.text
+
+    except httpx.HTTPStatusError as e:
+        raise ValueError(f"Groq Batch API HTTP error: {e.response.status_code} - {e.response.text}")
+    except httpx.HTTPError as e:
+        raise ValueError(f"Groq Batch API error: {str(e)}")
+
+    results: List[Union[Dict[str, Any], ValueError]] = [
+        ValueError(f"No result returned for item {i} (batch status: {batch['status']})")
+        for i in range(len(items))
+    ]
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        record = orjson.loads(line)
+        index = int(record["custom_id"].split("-", 1)[1])
+        results[index] = _parse_batch_record(record)
+
+    return results
+
+
+def _parse_batch_record(record: Dict[str, Any]) -> Union[Dict[str, Any], ValueError]:
+    """
+    Extract and validate the scoring result from one Batch API output line.
+    """
+    if record.get("error"):
+        return ValueError(f"Groq batch request failed: {record['error']}")
+
+    response = record.get("response") or {}
+    if response.get("status_code") != 200:
+        return ValueError(f"Groq batch request HTTP error: {response.get('status_code')} - {response.get('body')}")
+
+    try:
+        content = response["body"]["choices"][0]["message"]["content"]
+        return parse_scoring_result(clean_json_response(content))
+    except (KeyError, IndexError, TypeError) as e:
+        return ValueError(f"Unexpected Groq batch response format: {str(e)}")
+    except ValueError as e:
+        # Covers invalid JSON and schema validation errors
+        return e
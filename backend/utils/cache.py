@@ -0,0 +1,166 @@
+"""
+Exact-match cache for LLM scoring results.
+An in-process TTL cache is always on; Redis is used behind it when REDIS_URL
+is set (values stored as zstd-compressed JSON).
+"""
+import os
+from typing import Any, Dict, Optional
+
+import orjson
+from cachetools import TTLCache
+import redis.asyncio as redis
+import zstandard as zstd
+
+# Redis configuration
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_SCORE_TTL_SECONDS = int(os.getenv("REDIS_SCORE_TTL_SECONDS", "86400"))
+
+# In-process cache configuration
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "1024"))
+LOCAL_CACHE_TTL_SECONDS = int(os.getenv("LOCAL_CACHE_TTL_SECONDS", "3600"))
+
+# First cache tier, checked before Redis. Only touched from the event loop and
+# never across an await, so it needs no lock.
+_local_cache: TTLCache = TTLCache(maxsize=LOCAL_CACHE_MAX_ENTRIES, ttl=LOCAL_CACHE_TTL_SECONDS)
+
+# Compression dictionary: the skeleton of a scoring result. Field names make up
+# most of a small result and repeat across entries, so priming the compressor
+# with them roughly doubles the ratio over plain zstd.
+SCORING_ZDICT = zstd.ZstdCompressionDict(
+    b'{"overall_score":,"metrics":{"clarity":,"impact":,"professionalism":,"role_fit":,"ats":},'
+    b'"missing_keywords":["","strengths":["","top_fixes":["Add ","Quantify ",'
+    b'"section_feedback":[{"section":"Education","score":,"feedback":["","rewrites":[{"original":"","improved":""}]},'
+    b'{"section":"Summary","score":,"feedback":["",{"section":"Skills","score":,"feedback":["",'
+    b'{"section":"Projects","score":,"feedback":["","rewrites":[{"original":"","improved":"Built "}]},'
+    b'{"section":"Experience","score":,"feedback":["","rewrites":[{"original":"","improved":"Led "}]}],"notes":""}',
+    dict_type=zstd.DICT_TYPE_RAWCONTENT
+)
+_compressor = zstd.ZstdCompressor(level=6, dict_data=SCORING_ZDICT)
+_decompressor = zstd.ZstdDecompressor(dict_data=SCORING_ZDICT)
+
+# Namespace for compressed values, so entries written in another format
+# (or with another dictionary) are never decoded with this one
+_KEY_PREFIX = "z1:"
+
+# Global client instance
+_redis: Optional[redis.Redis] = None
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """
+    Get the shared Redis client.
+
+    Returns:
+        Optional[redis.Redis]: Redis client, or None if REDIS_URL is not set
+    """
+    global _redis
+    if _redis is None and REDIS_URL:
+        _redis = redis.from_url(REDIS_URL)
+    return _redis
+
+
+async def close_redis():
+    """
+    Close the Redis connection pool.
+    """
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+async def get_cached_score(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a validated scoring result by prompt hash, in process memory
+    first and then in Redis.
+
+    Args:
+        key: Cache key (see scoring.prompt_cache_key)
+
+    Returns:
+        Optional[Dict]: Cached result, or None on a miss or if Redis is unavailable
+    """
+    result = _local_cache.get(key)
+    if result is not None:
+        return result
+
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        cached = await client.get(_KEY_PREFIX + key)
+    except redis.RedisError as e:
+        # A cache outage must not fail scoring
+        print(f"⚠ Redis cache read failed: {str(e)}")
+        return None
+    if cached is None:
+        return None
+    try:
+        result = orjson.loads(_decompressor.decompress(cached))
+    except (zstd.ZstdError, orjson.JSONDecodeError) as e:
+        # A corrupt or truncated entry is a miss; drop it so it gets rewritten
+        print(f"⚠ Discarding unreadable cache entry: {str(e)}")
+        try:
+            await client.delete(_KEY_PREFIX + key)
+        except redis.RedisError:
+            pass
+        return None
+    _local_cache[key] = result
+    return result
+
+
+async def set_cached_score(key: str, result: Dict[str, Any]):
+    """
+    Store a validated scoring result under its prompt hash.
+
+    Args:
+        key: Cache key (see scoring.prompt_cache_key)
+        result: Validated scoring result
+    """
+    _local_cache[key] = result
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        value = _compressor.compress(orjson.dumps(result))
+        await client.setex(_KEY_PREFIX + key, REDIS_SCORE_TTL_SECONDS, value)
+    except redis.RedisError as e:
+        print(f"⚠ Redis cache write failed: {str(e)}")
+
+
+async def get_cached_embedding(key: str) -> Optional[bytes]:
+    """
+    Look up a stored embedding vector.
+
+    Args:
+        key: Embedding cache key (see SemanticCache.embed)
+
+    Returns:
+        Optional[bytes]: Raw float32 vector bytes, or None on a miss or if Redis is unavailable
+    """
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return await client.get(key)
+    except redis.RedisError as e:
+        print(f"⚠ Redis embedding cache read failed: {str(e)}")
+        return None
+
+
+async def set_cached_embedding(key: str, vector: bytes, ttl_seconds: int):
+    """
+    Store an embedding vector.
+
+    Args:
+        key: Embedding cache key (see SemanticCache.embed)
+        vector: Raw float32 vector bytes
+        ttl_seconds: Expiry in seconds
+    """
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.setex(key, ttl_seconds, vector)
+    except redis.RedisError as e:
+        print(f"⚠ Redis embedding cache write failed: {str(e)}")
@@ -1,14 +1,23 @@
 """
-LLM-based resume scoring utility using Ollama or Groq.
+LLM-based resume scoring utility using Ollama, Groq, or a vLLM server.
 Note: Environment variables are loaded in app.py before this module is imported.
 """
 import os
-import json
-from typing import Dict, Any
+import time
+import asyncio
+import hashlib
+from typing import Dict, Any, List, Optional
 import httpx
+import orjson
+import tiktoken
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+from pydantic import BaseModel, ConfigDict, ValidationError, conint
+
+from backend.utils.cache import get_cached_score, set_cached_score
+from backend.utils.semantic_cache import get_semantic_cache
 
 # LLM Provider configuration
-LLM_PROVIDER = os.getenv("LLM_PROVIDER", "ollama")
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "ollama").lower()
 
 # Ollama configuration
 OLLAMA_API_KEY = os.getenv("OLLAMA_API_KEY")
@@ -19,18 +28,259 @@ OLLAMA_MODEL = os.getenv("OLLAMA_MODEL")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
 
-PROMPT_VERSION = "1.0"
+# vLLM configuration (OpenAI-compatible server, e.g. http://localhost:8000)
+VLLM_BASE_URL = os.getenv("VLLM_BASE_URL")
+VLLM_MODEL = os.getenv("VLLM_MODEL")
+VLLM_API_KEY = os.getenv("VLLM_API_KEY")
+
+# Model served by the active provider
+if LLM_PROVIDER == "groq":
+    LLM_MODEL = GROQ_MODEL
+elif LLM_PROVIDER == "vllm":
+    LLM_MODEL = VLLM_MODEL
+else:
+    LLM_MODEL = OLLAMA_MODEL
+
+# Optional larger model, used only when the configured model's output fails
+# validation or hits a boundary score (see generate_routed_result)
+LLM_ESCALATION_MODEL = os.getenv("LLM_ESCALATION_MODEL")
+ESCALATION_BOUNDARY_SCORES = {0, 100}
+
+# Output token cap, the same for every provider. Decoding is sequential, so
+# latency grows linearly with the number of output tokens.
+MAX_OUTPUT_TOKENS = int(os.getenv("MAX_OUTPUT_TOKENS", "500"))
+
+# Request constants, built once at import instead of on every call
+_IS_LOCAL_OLLAMA = bool(OLLAMA_BASE_URL) and OLLAMA_BASE_URL.startswith(("http://localhost", "http://127.0.0.1"))
+_OLLAMA_URL = f"{(OLLAMA_BASE_URL or '').rstrip('/')}/api/generate"
+# Only include Authorization for cloud instances
+_OLLAMA_HEADERS = {"Content-Type": "application/json"}
+if not _IS_LOCAL_OLLAMA and OLLAMA_API_KEY:
+    _OLLAMA_HEADERS["Authorization"] = f"Bearer {OLLAMA_API_KEY}"
+_OLLAMA_STATIC_OPTIONS = {"temperature": 0, "num_predict": MAX_OUTPUT_TOKENS}
+
+_GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+_GROQ_HEADERS = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
+
+_VLLM_URL = f"{(VLLM_BASE_URL or '').rstrip('/')}/v1/chat/completions"
+# API key is optional (only needed if the server was started with --api-key)
+_VLLM_HEADERS = {"Content-Type": "application/json"}
+if VLLM_API_KEY:
+    _VLLM_HEADERS["Authorization"] = f"Bearer {VLLM_API_KEY}"
+
+# Groq speaks HTTP/2, so a few connections multiplex all concurrent requests
+# as streams (one handshake, no head-of-line queueing). Other endpoints may be
+# HTTP/1.1 even over TLS (e.g. vLLM or Ollama behind a proxy) and need a
+# connection per in-flight request.
+LLM_MAX_CONNECTIONS = int(os.getenv(
+    "LLM_MAX_CONNECTIONS",
+    "4" if LLM_PROVIDER == "groq" else "100"
+))
+
+# Constrained decoding: "json_object" (JSON mode), "json_schema" (strict schema,
+# only on models/servers that support it) or "off"
+STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "json_object").lower()
+
+# Resume text beyond this many tokens is cut before prompting
+MAX_INPUT_TOKENS = int(os.getenv("MAX_INPUT_TOKENS", "2000"))
+
+PROMPT_VERSION = "1.2"
+
+# Generic JSON-only instructions, used as the system message for any JSON task
+JSON_SYSTEM_PROMPT = """CRITICAL: You must respond with ONLY valid JSON. No markdown, no code blocks, no explanations.
+- Use double quotes for all strings
+- Escape all special characters properly
+- Do not include newlines inside string values
+- Ensure all brackets and braces are properly closed
+- Return ONLY the JSON object, nothing else
+
+Your response must be valid JSON that can be parsed by json.loads() in Python."""
+
+# Static scoring instructions and schema. Everything request-specific goes in the
+# user message, so this system prompt is byte-identical across requests and the
+# provider can reuse its cached prefix (KV cache) instead of re-running prefill.
+# The JSON-only instruction is given once, here.
+SCORING_SYSTEM_PROMPT = """You are an expert resume reviewer and recruiter. Score the resume in the user message for the role and company named there.
+
+Respond with one raw JSON object (no markdown, no commentary) of this shape:
+{"overall_score":int,"metrics":{"clarity":int,"impact":int,"professionalism":int,"role_fit":int,"ats":int},"missing_keywords":[str],"strengths":[str],"top_fixes":[str],"section_feedback":[{"section":"Experience|Projects|Skills|Education|Summary|Other","score":int,"feedback":[str],"rewrites":[{"original":str,"improved":str}]}],"notes":str}
+
+Scores are integers 0-100:
+- overall_score: weighted average, emphasis on role_fit
+- clarity: formatting, structure, readability
+- impact: metrics, quantified achievements, strong action verbs
+- professionalism: tone, grammar, consistency
+- role_fit: fit with the role's requirements and the company
+- ats: ATS-friendly formatting, keywords, parseability
+
+Content:
+- missing_keywords: 5-10 relevant keywords missing for this role
+- strengths: 3-5 specific strengths
+- top_fixes: 3-5 highest-impact improvements
+- section_feedback: 3-5 major sections, each with 1-2 rewrites of exact resume text adding quantifiable results
+- notes: executive summary, max 200 chars
+- Keep every string short, with no newlines"""
+
+
+# Shared HTTP client for LLM provider requests (created on first use)
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client for LLM provider requests.
+    Reusing one client keeps TCP/TLS connections alive across requests instead
+    of paying a new handshake on every call, and over HTTPS multiplexes
+    concurrent requests on a small HTTP/2 pool.
+    
+    Returns:
+        httpx.AsyncClient: Client with keep-alive connection pooling
+    """
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(240.0, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                keepalive_expiry=30.0
+            )
+        )
+    return _HTTP_CLIENT
+
+
+async def close_http_client():
+    """
+    Close the shared HTTP client.
+    """
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
+
+# Transient provider failures worth retrying (rate limit, timeout, server errors)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "5"))
+# Upper bound on a server-requested Retry-After delay
+MAX_RETRY_AFTER_SECONDS = 60.0
+
+_backoff = wait_exponential_jitter(initial=1, max=30)
 
 
-async def ollama_generate(prompt: str) -> str:
+def _is_retryable(exc: BaseException) -> bool:
+    """
+    Decide whether a failed provider request should be retried.
+    Read timeouts are not retried: the request already waited the full timeout.
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, httpx.TransportError) and not isinstance(exc, httpx.ReadTimeout)
+
+
+def _retry_wait(retry_state) -> float:
+    """
+    Wait as long as the provider's Retry-After header asks, if present,
+    otherwise back off exponentially with jitter.
+    """
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, httpx.HTTPStatusError):
+        retry_after = exc.response.headers.get("Retry-After")
+        try:
+            return min(float(retry_after), MAX_RETRY_AFTER_SECONDS)
+        except (TypeError, ValueError):
+            pass
+    return _backoff(retry_state)
+
+
+def _log_retry(retry_state):
+    exc = retry_state.outcome.exception()
+    reason = f"HTTP {exc.response.status_code}" if isinstance(exc, httpx.HTTPStatusError) else type(exc).__name__
+    print(
+        f"⚠ LLM request failed ({reason}), "
+        f"retrying in {retry_state.next_action.sleep:.1f}s "
+        f"(attempt {retry_state.attempt_number}/{LLM_MAX_ATTEMPTS})"
+    )
+
+
+# Applied to each provider request; the final error is re-raised unchanged
+_llm_retry = retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=_retry_wait,
+    stop=stop_after_attempt(LLM_MAX_ATTEMPTS),
+    before_sleep=_log_retry,
+    reraise=True
+)
+
+
+@_llm_retry
+async def _post_json(url: str, payload: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+    """
+    POST a JSON payload to a provider and decode the JSON response, retrying
+    transient failures.
+    """
+    client = await get_http_client()
+    response = await client.post(url, content=orjson.dumps(payload), headers=headers)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
+class _JSONObjectTracker:
+    """
+    Incrementally tracks brace depth over streamed text, ignoring braces inside
+    JSON strings, to detect when the first top-level object is closed.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> int:
+        """
+        Consume the next chunk of output.
+
+        Returns:
+            int: Index in text of the brace that closes the top-level JSON
+                object, or -1 if it is still open
+        """
+        for index, char in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+                self.started = True
+            elif char == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return index
+        return -1
+
+
+async def ollama_generate(
+    prompt: str,
+    system: str = JSON_SYSTEM_PROMPT,
+    model_override: Optional[str] = None
+) -> str:
     """
     Send a request to Ollama API to generate text.
     
     Args:
         prompt: The prompt text to send to the model
+        system: Static system prompt, sent separately so providers can cache it
+        model_override: Model to use instead of the provider's configured one
         
     Returns:
-        str: Raw text response from Ollama
+        str: Raw text response from Ollama (may still be wrapped in markdown fences)
         
     Raises:
         ValueError: If required env vars are missing or API request fails
@@ -40,72 +290,25 @@ async def ollama_generate(prompt: str) -> str:
     if not OLLAMA_MODEL:
         raise ValueError("OLLAMA_MODEL environment variable is not set")
     
-    # Check if using local Ollama (no API key required)
-    is_local_ollama = OLLAMA_BASE_URL.startswith("http://localhost") or OLLAMA_BASE_URL.startswith("http://127.0.0.1")
-    
     # API key is only required for cloud instances
-    if not is_local_ollama:
-        if not OLLAMA_API_KEY:
-            raise ValueError("OLLAMA_API_KEY environment variable is required for cloud Ollama instances")
-    
-    # Ensure base URL doesn't end with trailing slash for clean endpoint construction
-    base_url = OLLAMA_BASE_URL.rstrip('/')
-    url = f"{base_url}/api/generate"
-    
-    # Build headers - only include Authorization for cloud instances
-    headers = {
-        "Content-Type": "application/json"
-    }
-    if not is_local_ollama and OLLAMA_API_KEY:
-        headers["Authorization"] = f"Bearer {OLLAMA_API_KEY}"
-    
-    # Always build enhanced_prompt and payload (works for both local and cloud)
-    json_instructions = """CRITICAL: You must respond with ONLY valid JSON. No markdown, no code blocks, no explanations.
-- Use double quotes for all strings
-- Escape all special characters properly
-- Do not include newlines inside string values
-- Ensure all brackets and braces are properly closed
-- Return ONLY the JSON object, nothing else
-
-Your response must be valid JSON that can be parsed by json.loads() in Python.
-
-"""
-    enhanced_prompt = json_instructions + prompt
+    if not _IS_LOCAL_OLLAMA and not OLLAMA_API_KEY:
+        raise ValueError("OLLAMA_API_KEY environment variable is required for cloud Ollama instances")
     
     payload = {
-        "model": OLLAMA_MODEL,
-        "prompt": enhanced_prompt,
-        "stream": False,
-        "options": {
-            "temperature": 0,
-            "num_predict": 300
-        }
+        "model": model_override or OLLAMA_MODEL,
+        "system": system,
+        "prompt": prompt,
+        "stream": True,
+        "options": _OLLAMA_STATIC_OPTIONS
     }
+    if STRUCTURED_OUTPUT != "off":
+        # JSON-mode decoding (Ollama >= 0.1.9)
+        payload["format"] = "json"
     
     try:
-        async with httpx.AsyncClient(timeout=httpx.Timeout(240.0)) as client:
-            response = await client.post(url, json=payload, headers=headers)
-            response.raise_for_status()
+        # Markdown fences are stripped once, by the caller
+        return await _ollama_stream(payload)
             
-            result = response.json()
-            
-            # Ollama /api/generate returns {"response": "..."} format
-            if "response" in result:
-                # Sanitize the response
-                cleaned = result["response"].strip()
-                # Remove triple backticks if present
-                if cleaned.startswith("```") and cleaned.endswith("```"):
-                    cleaned = cleaned[3:-3].strip()
-                # Remove single backtick if present
-                elif cleaned.startswith("`") and cleaned.endswith("`"):
-                    cleaned = cleaned[1:-1].strip()
-                # Final strip
-                cleaned = cleaned.strip()
-                return cleaned
-            else:
-                # Fallback: if response format is different, try to get text
-                raise ValueError(f"Unexpected Ollama response format: {result}")
-                
     except httpx.HTTPStatusError as e:
         raise ValueError(f"Ollama API HTTP error: {e.response.status_code} - {e.response.text}")
     except httpx.TimeoutException:
@@ -114,15 +317,87 @@ Your response must be valid JSON that can be parsed by json.loads() in Python.
         raise ValueError(f"Ollama API error: {str(e)}")
 
 
-async def groq_generate(prompt: str) -> str:
+@_llm_retry
+async def _ollama_stream(payload: Dict[str, Any]) -> str:
+    """
+    Stream an Ollama generation, stopping as soon as the top-level JSON object
+    is complete. Retried from the start on transient failures.
+    """
+    chunks: List[str] = []
+    tracker = _JSONObjectTracker()
+    
+    client = await get_http_client()
+    async with client.stream("POST", _OLLAMA_URL, content=orjson.dumps(payload), headers=_OLLAMA_HEADERS) as response:
+        if response.is_error:
+            # Read the body so the error message can include it
+            await response.aread()
+        response.raise_for_status()
+        
+        # Streamed as NDJSON: {"response": "<token(s)>", "done": false} per line
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            result = orjson.loads(line)
+            if "error" in result:
+                raise ValueError(f"Ollama generation error: {result['error']}")
+            if "response" not in result:
+                raise ValueError(f"Unexpected Ollama response format: {result}")
+            
+            text = result["response"]
+            end = tracker.feed(text)
+            if end >= 0:
+                # Keep nothing after the closing brace, then stop reading; leaving
+                # the stream context closes it and Ollama stops generating
+                chunks.append(text[:end + 1])
+                break
+            chunks.append(text)
+            if result.get("done"):
+                break
+    
+    return "".join(chunks)
+
+
+def build_groq_payload(
+    prompt: str,
+    system: str = JSON_SYSTEM_PROMPT,
+    model_override: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build the chat completions request body for Groq.
+    Shared by real-time calls and Batch API requests.
+    
+    Args:
+        prompt: The prompt text to send to the model
+        system: Static system prompt
+        model_override: Model to use instead of GROQ_MODEL
+        
+    Returns:
+        Dict: OpenAI-compatible chat completions payload
+    """
+    payload = {
+        **_GROQ_STATIC_PAYLOAD,
+        "messages": [_system_message(system), {"role": "user", "content": prompt}]
+    }
+    if model_override:
+        payload["model"] = model_override
+    return payload
+
+
+async def groq_generate(
+    prompt: str,
+    system: str = JSON_SYSTEM_PROMPT,
+    model_override: Optional[str] = None
+) -> str:
     """
     Send a request to Groq API to generate text.
     
     Args:
         prompt: The prompt text to send to the model
+        system: Static system prompt, sent separately so providers can cache it
+        model_override: Model to use instead of the provider's configured one
         
     Returns:
-        str: Raw text response from Groq
+        str: Raw text response from Groq (may still be wrapped in markdown fences)
         
     Raises:
         ValueError: If required env vars are missing or API request fails
@@ -132,79 +407,99 @@ async def groq_generate(prompt: str) -> str:
     if not GROQ_MODEL:
         raise ValueError("GROQ_MODEL environment variable is not set")
     
-    url = "https://api.groq.com/openai/v1/chat/completions"
+    payload = build_groq_payload(prompt, system, model_override)
     
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
+    try:
+        result = await _post_json(_GROQ_URL, payload, _GROQ_HEADERS)
+        
+        # Groq returns OpenAI-compatible format: {"choices": [{"message": {"content": "..."}}]}
+        # Defensive parsing with .get()
+        choices = result.get("choices", [])
+        if choices and len(choices) > 0:
+            message = choices[0].get("message", {})
+            content = message.get("content", "")
+            if not content:
+                raise ValueError(f"Groq response missing content. Full result: {result}")
+            # Markdown fences are stripped once, by the caller
+            return content
+        else:
+            raise ValueError(f"Unexpected Groq response format: {result}")
+            
+    except httpx.HTTPStatusError as e:
+        raise ValueError(f"Groq API HTTP error: {e.response.status_code} - {e.response.text}")
+    except httpx.TimeoutException:
+        raise ValueError("Groq API request timed out after 240 seconds")
+    except Exception as e:
+        raise ValueError(f"Groq API error: {str(e)}")
+
+
+async def vllm_generate(
+    prompt: str,
+    system: str = JSON_SYSTEM_PROMPT,
+    model_override: Optional[str] = None
+) -> str:
+    """
+    Send a request to a vLLM server's OpenAI-compatible API to generate text.
+    vLLM batches concurrent requests on the GPU (continuous batching), so
+    parallel /score calls are served together instead of queueing.
+    
+    Args:
+        prompt: The prompt text to send to the model
+        system: Static system prompt, sent separately so providers can cache it
+        model_override: Model to use instead of the provider's configured one
+        
+    Returns:
+        str: Raw text response from vLLM (may still be wrapped in markdown fences)
+        
+    Raises:
+        ValueError: If required env vars are missing or API request fails
+    """
+    if not VLLM_BASE_URL:
+        raise ValueError("VLLM_BASE_URL environment variable is not set")
+    if not VLLM_MODEL:
+        raise ValueError("VLLM_MODEL environment variable is not set")
     
     payload = {
-        "model": GROQ_MODEL,
-        "messages": [
-            {
-                "role": "system",
-                "content": """CRITICAL: You must respond with ONLY valid JSON. No markdown, no code blocks, no explanations.
-- Use double quotes for all strings
-- Escape all special characters properly
-- Do not include newlines inside string values
-- Ensure all brackets and braces are properly closed
-- Return ONLY the JSON object, nothing else
-
-Your response must be valid JSON that can be parsed by json.loads() in Python."""
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ],
-        "temperature": 0,
-        "max_tokens": 600
+        **_VLLM_STATIC_PAYLOAD,
+        "messages": [_system_message(system), {"role": "user", "content": prompt}]
     }
+    if model_override:
+        payload["model"] = model_override
     
     try:
-        async with httpx.AsyncClient(timeout=httpx.Timeout(240.0)) as client:
-            response = await client.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            
-            result = response.json()
+        result = await _post_json(_VLLM_URL, payload, _VLLM_HEADERS)
+        
+        # vLLM returns OpenAI-compatible format: {"choices": [{"message": {"content": "..."}}]}
+        choices = result.get("choices", [])
+        if choices:
+            content = choices[0].get("message", {}).get("content", "")
+            if not content:
+                raise ValueError(f"vLLM response missing content. Full result: {result}")
+            # Markdown fences are stripped once, by the caller
+            return content
+        else:
+            raise ValueError(f"Unexpected vLLM response format: {result}")
             
-            # Groq returns OpenAI-compatible format: {"choices": [{"message": {"content": "..."}}]}
-            # Defensive parsing with .get()
-            choices = result.get("choices", [])
-            if choices and len(choices) > 0:
-                message = choices[0].get("message", {})
-                content = message.get("content", "")
-                if not content:
-                    raise ValueError(f"Groq response missing content. Full result: {result}")
-                # Sanitize the response (same as ollama_generate)
-                cleaned = content.strip()
-                # Remove triple backticks if present
-                if cleaned.startswith("```") and cleaned.endswith("```"):
-                    cleaned = cleaned[3:-3].strip()
-                # Remove single backtick if present
-                elif cleaned.startswith("`") and cleaned.endswith("`"):
-                    cleaned = cleaned[1:-1].strip()
-                # Final strip
-                cleaned = cleaned.strip()
-                return cleaned
-            else:
-                raise ValueError(f"Unexpected Groq response format: {result}")
-                
     except httpx.HTTPStatusError as e:
-        raise ValueError(f"Groq API HTTP error: {e.response.status_code} - {e.response.text}")
+        raise ValueError(f"vLLM API HTTP error: {e.response.status_code} - {e.response.text}")
     except httpx.TimeoutException:
-        raise ValueError("Groq API request timed out after 240 seconds")
+        raise ValueError("vLLM API request timed out after 240 seconds")
     except Exception as e:
-        raise ValueError(f"Groq API error: {str(e)}")
+        raise ValueError(f"vLLM API error: {str(e)}")
 
 
-async def llm_generate(prompt: str) -> str:
+async def llm_generate(
+    prompt: str,
+    system: str = JSON_SYSTEM_PROMPT,
+    model_override: Optional[str] = None
+) -> str:
     """
     Route LLM generation request to the appropriate provider.
     
     Args:
         prompt: The prompt text to send to the model
+        system: Static system prompt, sent separately so providers can cache it
+        model_override: Model to use instead of the provider's configured one
         
     Returns:
         str: Raw text response from the LLM
@@ -213,14 +508,188 @@ async def llm_generate(prompt: str) -> str:
         ValueError: If provider is invalid or API request fails
     """
     if LLM_PROVIDER == "groq":
-        return await groq_generate(prompt)
+        return await groq_generate(prompt, system, model_override)
+    elif LLM_PROVIDER == "vllm":
+        return await vllm_generate(prompt, system, model_override)
     else:
-        return await ollama_generate(prompt)
+        return await ollama_generate(prompt, system, model_override)
+
+
+class InvalidJSONError(ValueError):
+    """
+    Raised when the LLM output is not parseable JSON.
+    """
+
+
+# Scoring result schema, validated in compiled code by pydantic-core
+Score = conint(ge=0, le=100)
+
+# Strict structured output requires every object to forbid extra keys. This only
+# affects the generated JSON Schema; validation still ignores unknown keys.
+_STRICT_SCHEMA = ConfigDict(json_schema_extra={"additionalProperties": False})
+
+
+class Metrics(BaseModel):
+    model_config = _STRICT_SCHEMA
+
+    clarity: Score
+    impact: Score
+    professionalism: Score
+    role_fit: Score
+    ats: Score
+
+
+class Rewrite(BaseModel):
+    model_config = _STRICT_SCHEMA
+
+    original: str
+    improved: str
+
+
+class SectionFeedback(BaseModel):
+    model_config = _STRICT_SCHEMA
+
+    section: str
+    score: Score
+    feedback: List[str]
+    rewrites: List[Rewrite]
+
+
+class ScoringResult(BaseModel):
+    model_config = _STRICT_SCHEMA
+
+    overall_score: Score
+    metrics: Metrics
+    missing_keywords: List[str]
+    strengths: List[str]
+    top_fixes: List[str]
+    section_feedback: List[SectionFeedback]
+    notes: str
+
+
+SCORING_JSON_SCHEMA = ScoringResult.model_json_schema()
+
+# OpenAI-compatible response_format sent to Groq and vLLM
+if STRUCTURED_OUTPUT == "json_schema":
+    RESPONSE_FORMAT: Optional[Dict[str, Any]] = {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "resume_score",
+            "strict": True,
+            "schema": SCORING_JSON_SCHEMA
+        }
+    }
+elif STRUCTURED_OUTPUT == "json_object":
+    RESPONSE_FORMAT = {"type": "json_object"}
+else:
+    RESPONSE_FORMAT = None
+
+# Request-independent parts of the chat completions payloads, built once. Only
+# the user message is new per request; the scoring system message is one shared
+# dict, so it serializes byte-identically (prompt-cache friendly).
+_SCORING_SYSTEM_MSG = {"role": "system", "content": SCORING_SYSTEM_PROMPT}
+_GROQ_STATIC_PAYLOAD: Dict[str, Any] = {"model": GROQ_MODEL, "temperature": 0, "max_tokens": MAX_OUTPUT_TOKENS}
+_VLLM_STATIC_PAYLOAD: Dict[str, Any] = {"model": VLLM_MODEL, "temperature": 0, "max_tokens": MAX_OUTPUT_TOKENS}
+if RESPONSE_FORMAT is not None:
+    _GROQ_STATIC_PAYLOAD["response_format"] = RESPONSE_FORMAT
+    _VLLM_STATIC_PAYLOAD["response_format"] = RESPONSE_FORMAT
+
+
+def _system_message(system: str) -> Dict[str, str]:
+    """
+    Return the chat system message for a system prompt, reusing the
+    prebuilt one for the scoring prompt.
+    """
+    if system == SCORING_SYSTEM_PROMPT:
+        return _SCORING_SYSTEM_MSG
+    return {"role": "system", "content": system}
+
+
+# Static opening of the retry prompt sent when the first output is not valid JSON
+FIX_PROMPT_PREFIX = """The previous JSON output was invalid. Fix it to be valid JSON matching the exact schema given in the system message.
+
+Previous invalid output:
+"""
+
+
+# Tokenizer for the input budget. Loading may download the BPE file, so it is
+# done off the event loop: at startup (load_token_encoding) and, after a failure,
+# again in the background at most every ENCODING_RETRY_SECONDS.
+_ENCODING: Optional[tiktoken.Encoding] = None
+_ENCODING_TASK: Optional[asyncio.Task] = None
+_ENCODING_RETRY_AT = 0.0
+ENCODING_RETRY_SECONDS = 300
+# Rough English average, used while the tokenizer is unavailable
+_CHARS_PER_TOKEN = 4
+
+
+def _load_encoding_sync():
+    global _ENCODING, _ENCODING_RETRY_AT
+    try:
+        _ENCODING = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        _ENCODING_RETRY_AT = time.monotonic() + ENCODING_RETRY_SECONDS
+        print(f"⚠ tiktoken encoding unavailable, truncating by characters until it loads: {str(e)}")
+
+
+async def load_token_encoding():
+    """
+    Load the tiktoken encoding in a worker thread, without blocking the event loop.
+    Call once at startup; a failed load is retried later by truncate_to_token_budget.
+    """
+    if _ENCODING is None:
+        await asyncio.to_thread(_load_encoding_sync)
+
+
+def _schedule_encoding_retry():
+    """
+    Start a background load of the encoding if none is running and the retry
+    delay has passed. No-op outside a running event loop.
+    """
+    global _ENCODING_TASK
+    if _ENCODING_TASK is not None and not _ENCODING_TASK.done():
+        return
+    if time.monotonic() < _ENCODING_RETRY_AT:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    _ENCODING_TASK = loop.create_task(load_token_encoding())
+
+
+def truncate_to_token_budget(text: str, max_tokens: int = MAX_INPUT_TOKENS) -> str:
+    """
+    Cut text down to at most max_tokens tokens (cl100k_base).
+    Falls back to a character budget while the tokenizer is not loaded.
+    
+    Args:
+        text: Text to truncate
+        max_tokens: Token budget
+        
+    Returns:
+        str: The text, truncated if it was over budget
+    """
+    # Every token covers at least one character
+    if len(text) <= max_tokens:
+        return text
+    
+    if _ENCODING is None:
+        _schedule_encoding_retry()
+        return text[:max_tokens * _CHARS_PER_TOKEN]
+    
+    tokens = _ENCODING.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    print(f"Resume truncated from {len(tokens)} to {max_tokens} tokens")
+    return _ENCODING.decode(tokens[:max_tokens])
 
 
 def build_scoring_prompt(resume_text: str, company: str, role: str) -> str:
     """
-    Build a prompt-engineered rubric for resume scoring.
+    Build the request-specific part of the scoring prompt.
+    The rubric and schema live in SCORING_SYSTEM_PROMPT. The resume is cut
+    to MAX_INPUT_TOKENS to bound input cost and prefill latency.
     
     Args:
         resume_text: The resume text content
@@ -228,82 +697,23 @@ def build_scoring_prompt(resume_text: str, company: str, role: str) -> str:
         role: Target role/job title
         
     Returns:
-        str: Complete prompt for the LLM
+        str: User message for the LLM
     """
-    prompt = f"""You are an expert resume reviewer and recruiter. Analyze the following resume for a {role} position at {company}.
-
-Return compact JSON only.
-Use short strings; no paragraphs.
-Limit each list to max 5 items.
-If unsure, return best guess but keep JSON valid.
+    resume_text = truncate_to_token_budget(resume_text)
+    return f"""Analyze the following resume for a {role} position at {company}.
 
 Resume Text:
 ---
 {resume_text}
----
-
-Provide a comprehensive analysis and scoring. Output MUST be valid JSON matching this exact schema (no markdown, no code blocks, just raw JSON):
-
-{{
-  "overall_score": <0-100 integer>,
-  "metrics": {{
-    "clarity": <0-100 integer>,
-    "impact": <0-100 integer>,
-    "professionalism": <0-100 integer>,
-    "role_fit": <0-100 integer>,
-    "ats": <0-100 integer>
-  }},
-  "missing_keywords": [<array of strings>],
-  "strengths": [<array of strings, 3-5 items>],
-  "top_fixes": [<array of strings, 3-5 items>],
-  "section_feedback": [
-    {{
-      "section": "<Experience|Projects|Skills|Education|Summary|Other>",
-      "score": <0-100 integer>,
-      "feedback": [<array of strings>],
-      "rewrites": [
-        {{
-          "original": "<exact text from resume>",
-          "improved": "<improved version with metrics>"
-        }}
-      ]
-    }}
-  ],
-  "notes": "<brief summary string, max 200 chars>"
-}}
-
-Scoring Guidelines:
-- overall_score: Weighted average considering all factors, emphasis on role_fit
-- clarity: How clear and easy to understand (formatting, structure, readability)
-- impact: Use of metrics, quantifiable achievements, strong action verbs
-- professionalism: Appropriate tone, grammar, consistency, no errors
-- role_fit: Alignment with {role} requirements and {company} culture
-- ats: ATS-friendly formatting, keyword usage, parseability
-
-Requirements:
-- All scores must be integers 0-100
-- missing_keywords: 5-10 relevant technical/keywords missing for this role
-- strengths: 3-5 specific strengths
-- top_fixes: 3-5 highest-impact improvements
-- section_feedback: Analyze 3-6 major sections (Experience, Projects, Skills, Education, Summary, etc.)
-- rewrites: Include 2-4 example bullet rewrites per section with quantifiable improvements
-- notes: Brief executive summary
-
-CRITICAL: You must respond with ONLY valid JSON. No markdown, no code blocks, no explanations.
-- Use double quotes for all strings
-- Escape all special characters properly
-- Do not include newlines inside string values
-- Ensure all brackets and braces are properly closed
-- Return ONLY the JSON object, nothing else
-
-Your response must be valid JSON that can be parsed by json.loads() in Python."""
-    
-    return prompt
+---"""
 
 
 def clean_json_response(content: str) -> str:
     """
     Clean LLM response to extract valid JSON.
+    Removes surrounding markdown fences (```json, ``` or single backticks)
+    with fixed prefix/suffix checks, so the cost stays linear in the length
+    of the output.
     
     Args:
         content: Raw response from LLM
@@ -311,31 +721,72 @@ def clean_json_response(content: str) -> str:
     Returns:
         str: Cleaned JSON string
     """
-    # Strip whitespace
     cleaned = content.strip()
     
-    # Remove markdown code blocks (```json or ```)
-    if cleaned.startswith("```json"):
-        cleaned = cleaned[7:].strip()
-    elif cleaned.startswith("```"):
-        cleaned = cleaned[3:].strip()
+    # Opening fence: ```json, ``` or a single backtick
+    if cleaned.startswith("```"):
+        cleaned = cleaned[3:]
+        if cleaned[:4].lower() == "json":
+            cleaned = cleaned[4:]
+    elif cleaned.startswith("`"):
+        cleaned = cleaned[1:]
     
+    # Closing fence: ``` or a single backtick
     if cleaned.endswith("```"):
-        cleaned = cleaned[:-3].strip()
+        cleaned = cleaned[:-3]
+    elif cleaned.endswith("`"):
+        cleaned = cleaned[:-1]
     
-    # Remove single backticks if present
-    if cleaned.startswith("`") and cleaned.endswith("`"):
-        cleaned = cleaned[1:-1].strip()
+    return cleaned.strip()
+
+
+def prompt_cache_key(prompt: str) -> str:
+    """
+    Build the exact-match cache key for a scoring prompt.
+    Generation is deterministic (temperature 0), so identical provider, model
+    and prompts yield identical results.
     
-    # Final strip
-    cleaned = cleaned.strip()
+    Args:
+        prompt: User message built by build_scoring_prompt
+        
+    Returns:
+        str: Cache key of the form "score:<sha256>"
+    """
+    material = f"{LLM_PROVIDER}|{LLM_MODEL}|{LLM_ESCALATION_MODEL}|{SCORING_SYSTEM_PROMPT}|{prompt}"
+    return "score:" + hashlib.sha256(material.encode()).hexdigest()
+
+
+async def get_cached_scoring_result(resume_text: str, company: str, role: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a resume's score in the exact-match cache (in-process, then Redis)
+    without calling the LLM.
     
-    return cleaned
+    Args:
+        resume_text: The resume text content
+        company: Company name
+        role: Target role/job title
+        
+    Returns:
+        Optional[Dict]: Cached result, as score_resume_with_llm returns it, or None on a miss
+    """
+    return await get_cached_score(prompt_cache_key(build_scoring_prompt(resume_text, company, role)))
+
+
+# Scoring calls in flight, keyed by prompt cache key, so concurrent identical
+# requests share a single LLM call. No lock is needed: the lookup and insert
+# below run with no await in between, so they are atomic on the event loop.
+_INFLIGHT: Dict[str, asyncio.Task] = {}
 
 
-async def score_resume_with_llm(resume_text: str, company: str, role: str) -> Dict[str, Any]:
+async def score_resume_with_llm(
+    resume_text: str,
+    company: str,
+    role: str
+) -> Dict[str, Any]:
     """
-    Call LLM API to score a resume.
+    Score a resume, serving repeats from the exact-match cache (in-process,
+    then Redis) and near-duplicates from the semantic cache when enabled.
+    Concurrent calls for the same prompt wait on one shared call.
     
     Args:
         resume_text: The resume text content
@@ -343,77 +794,159 @@ async def score_resume_with_llm(resume_text: str, company: str, role: str) -> Di
         role: Target role/job title
         
     Returns:
-        Dict: Validated scoring result matching the schema
+        Dict: Validated scoring result matching the schema, plus a "model" key
+            naming the model that produced it
         
     Raises:
         ValueError: If JSON is invalid after retry or API key missing
         Exception: For API errors
     """
     prompt = build_scoring_prompt(resume_text, company, role)
+    cache_key = prompt_cache_key(prompt)
+    
+    task = _INFLIGHT.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(_score_prompt(prompt, cache_key, resume_text, company, role))
+        _INFLIGHT[cache_key] = task
+        task.add_done_callback(lambda done: _finish_inflight(cache_key, done))
+    
+    # Shielded so one caller disconnecting doesn't cancel the call for the others
+    return await asyncio.shield(task)
+
+
+def _finish_inflight(cache_key: str, task: asyncio.Task):
+    """
+    Drop a finished call from the in-flight table.
+    """
+    _INFLIGHT.pop(cache_key, None)
+    # Mark the exception as retrieved in case every waiter was cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+async def _score_prompt(
+    prompt: str,
+    cache_key: str,
+    resume_text: str,
+    company: str,
+    role: str
+) -> Dict[str, Any]:
+    """
+    Resolve a scoring prompt through the caches, falling back to the LLM.
+    """
+    # Exact-match cache, in-process then Redis (results are validated before they are stored)
+    cached_result = await get_cached_score(cache_key)
+    if cached_result is not None:
+        return cached_result
+    
+    semantic_cache = get_semantic_cache()
+    if semantic_cache is not None:
+        partition = (PROMPT_VERSION, company.lower(), role.lower())
+        embedding = await semantic_cache.embed(resume_text)
+        cached_result = semantic_cache.lookup(partition, embedding)
+        if cached_result is not None:
+            return cached_result
+    
+    validated_result = await generate_routed_result(prompt)
+    
+    await set_cached_score(cache_key, validated_result)
+    if semantic_cache is not None:
+        semantic_cache.store(partition, embedding, validated_result)
+    
+    return validated_result
+
+
+# Running totals for tuning escalation (per process)
+_routing_stats = {"scored": 0, "escalated": 0}
+
+
+async def generate_routed_result(prompt: str) -> Dict[str, Any]:
+    """
+    Score with the configured (small, fast) model, escalating to
+    LLM_ESCALATION_MODEL when its output is unusable or looks like a refusal
+    (an overall score of exactly 0 or 100). Without an escalation model only
+    the configured model runs.
+    
+    Args:
+        prompt: User message built by build_scoring_prompt
+        
+    Returns:
+        Dict: Validated scoring result matching the schema, plus a "model" key
+            naming the model that produced it
+        
+    Raises:
+        ValueError: If scoring fails (on the escalation model, if one ran)
+    """
+    if not LLM_ESCALATION_MODEL:
+        return {**await generate_scoring_result(prompt), "model": LLM_MODEL}
+    
+    _routing_stats["scored"] += 1
+    try:
+        result = await generate_scoring_result(prompt)
+        if result["overall_score"] not in ESCALATION_BOUNDARY_SCORES:
+            return {**result, "model": LLM_MODEL}
+        reason = f"boundary overall_score {result['overall_score']}"
+    except (InvalidJSONError, ValidationError) as e:
+        # Only output problems escalate; config and API errors propagate
+        reason = f"invalid output: {type(e).__name__}"
+    
+    _routing_stats["escalated"] += 1
+    rate = _routing_stats["escalated"] / _routing_stats["scored"]
+    print(
+        f"⚠ Escalating to {LLM_ESCALATION_MODEL} ({reason}); "
+        f"escalation rate {_routing_stats['escalated']}/{_routing_stats['scored']} ({rate:.1%})"
+    )
+    result = await generate_scoring_result(prompt, model_override=LLM_ESCALATION_MODEL)
+    return {**result, "model": LLM_ESCALATION_MODEL}
+
+
+async def generate_scoring_result(
+    prompt: str,
+    model_override: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Call LLM API to score a resume, retrying once with a fix prompt if the
+    output is not valid JSON.
     
+    Args:
+        prompt: User message built by build_scoring_prompt
+        model_override: Model to use instead of the provider's configured one
+        
+    Returns:
+        Dict: Validated scoring result matching the schema
+        
+    Raises:
+        ValueError: If JSON is invalid after retry or API key missing
+        Exception: For API errors
+    """
     try:
         # First attempt
-        content = await llm_generate(prompt)
+        content = await llm_generate(prompt, SCORING_SYSTEM_PROMPT, model_override)
         content = clean_json_response(content)
         
         try:
-            result = json.loads(content)
-            validated_result = validate_scoring_result(result)
-            return validated_result
-        except json.JSONDecodeError as e:
+            return parse_scoring_result(content)
+        except InvalidJSONError as e:
             # Retry with fix prompt
             print(f"First attempt JSON parse failed: {e}. Raw content: {content[:500]}")
             
-            fix_prompt = f"""The previous JSON output was invalid. Fix it to be valid JSON matching this exact schema:
-
-{{
-  "overall_score": <0-100 integer>,
-  "metrics": {{
-    "clarity": <0-100 integer>,
-    "impact": <0-100 integer>,
-    "professionalism": <0-100 integer>,
-    "role_fit": <0-100 integer>,
-    "ats": <0-100 integer>
-  }},
-  "missing_keywords": [<array of strings>],
-  "strengths": [<array of strings>],
-  "top_fixes": [<array of strings>],
-  "section_feedback": [
-    {{
-      "section": "<Experience|Projects|Skills|Education|Summary|Other>",
-      "score": <0-100 integer>,
-      "feedback": [<array of strings>],
-      "rewrites": [
-        {{
-          "original": "<string>",
-          "improved": "<string>"
-        }}
-      ]
-    }}
-  ],
-  "notes": "<string>"
-}}
-
-Previous invalid output:
-{content[:2000]}
-
-Return ONLY valid JSON, no markdown, no code blocks, just raw JSON:"""
+            # The schema is already in the (cached) system prompt; only the
+            # invalid output is request-specific
+            fix_prompt = f"{FIX_PROMPT_PREFIX}{content[:2000]}"
             
-            retry_content = await llm_generate(fix_prompt)
+            retry_content = await llm_generate(fix_prompt, SCORING_SYSTEM_PROMPT, model_override)
             retry_content = clean_json_response(retry_content)
             
             try:
-                result = json.loads(retry_content)
-                validated_result = validate_scoring_result(result)
-                return validated_result
-            except json.JSONDecodeError as parse_error:
+                return parse_scoring_result(retry_content)
+            except InvalidJSONError as parse_error:
                 # Still invalid after retry - provide detailed error
                 error_msg = (
                     f"Could not parse JSON after retry. "
                     f"Parse error: {str(parse_error)}. "
                     f"Raw model output (first 2000 chars): {retry_content[:2000]}"
                 )
-                raise ValueError(error_msg)
+                raise InvalidJSONError(error_msg)
                 
     except ValueError:
         # Re-raise ValueError (API key errors, JSON errors)
@@ -435,64 +968,28 @@ def validate_scoring_result(result: Dict[str, Any]) -> Dict[str, Any]:
     Raises:
         ValueError: If required fields are missing or invalid
     """
-    required_fields = [
-        "overall_score",
-        "metrics",
-        "missing_keywords",
-        "strengths",
-        "top_fixes",
-        "section_feedback",
-        "notes"
-    ]
-    
-    # Check all required top-level fields exist
-    for field in required_fields:
-        if field not in result:
-            raise ValueError(f"Missing required field: {field}")
-    
-    # Validate overall_score
-    overall_score = result["overall_score"]
-    if not isinstance(overall_score, int) or overall_score < 0 or overall_score > 100:
-        raise ValueError(f"overall_score must be integer 0-100, got: {overall_score}")
-    
-    # Validate metrics
-    metrics = result["metrics"]
-    required_metrics = ["clarity", "impact", "professionalism", "role_fit", "ats"]
-    for metric in required_metrics:
-        if metric not in metrics:
-            raise ValueError(f"Missing metric: {metric}")
-        score = metrics[metric]
-        if not isinstance(score, int) or score < 0 or score > 100:
-            raise ValueError(f"{metric} must be integer 0-100, got: {score}")
-    
-    # Validate arrays
-    for field in ["missing_keywords", "strengths", "top_fixes"]:
-        if not isinstance(result[field], list):
-            raise ValueError(f"{field} must be an array")
-        if not all(isinstance(item, str) for item in result[field]):
-            raise ValueError(f"{field} must be array of strings")
-    
-    # Validate section_feedback
-    if not isinstance(result["section_feedback"], list):
-        raise ValueError("section_feedback must be an array")
-    
-    for section in result["section_feedback"]:
-        if not isinstance(section, dict):
-            raise ValueError("Each section_feedback item must be an object")
-        if "section" not in section or "score" not in section or "feedback" not in section or "rewrites" not in section:
-            raise ValueError("section_feedback items must have: section, score, feedback, rewrites")
-        if not isinstance(section["score"], int) or section["score"] < 0 or section["score"] > 100:
-            raise ValueError(f"section score must be integer 0-100, got: {section['score']}")
-        if not isinstance(section["feedback"], list):
-            raise ValueError("section feedback must be an array")
-        if not isinstance(section["rewrites"], list):
-            raise ValueError("section rewrites must be an array")
-        for rewrite in section["rewrites"]:
-            if not isinstance(rewrite, dict) or "original" not in rewrite or "improved" not in rewrite:
-                raise ValueError("rewrites must have original and improved fields")
-    
-    # Validate notes
-    if not isinstance(result["notes"], str):
-        raise ValueError("notes must be a string")
-    
-    return result
+    return ScoringResult.model_validate(result).model_dump()
+
+
+def parse_scoring_result(content: str) -> Dict[str, Any]:
+    """
+    Parse and validate raw LLM JSON in a single pydantic-core pass,
+    without building an intermediate dict with json.loads.
+    
+    Args:
+        content: JSON text from the LLM (markdown fences already removed)
+        
+    Returns:
+        Dict: Validated and normalized result
+        
+    Raises:
+        InvalidJSONError: If the content is not valid JSON
+        ValueError: If required fields are missing or invalid
+    """
+    try:
+        return ScoringResult.model_validate_json(content).model_dump()
+    except ValidationError as e:
+        json_errors = [error for error in e.errors() if error["type"] == "json_invalid"]
+        if json_errors:
+            raise InvalidJSONError(json_errors[0]["msg"])
+        raise
@@ -0,0 +1,211 @@
+"""
+Semantic response cache for resume scoring.
+Returns a stored scoring result when a resume is a near-duplicate of one already
+scored for the same company, role and prompt version.
+Requires the optional numpy and sentence-transformers packages.
+"""
+import os
+import time
+import asyncio
+import bisect
+import hashlib
+import threading
+from typing import Any, Dict, Hashable, Optional
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    np = None
+    SentenceTransformer = None
+
+from backend.utils.cache import get_cached_embedding, set_cached_embedding
+
+# Semantic cache configuration (disabled by default)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_MODEL = os.getenv("SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "86400"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000"))
+# Resume embeddings are also kept in Redis (when configured), so the same resume
+# scored for another role or by another worker is not re-embedded
+EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "86400"))
+
+# Only the start of the resume is embedded; it dominates the embedding anyway
+EMBED_MAX_CHARS = 4000
+
+
+class SemanticCache:
+    """
+    In-memory nearest-neighbour cache of scoring results.
+
+    Entries are partitioned by an exact key (prompt version, company, role), and
+    within a partition the closest resume embedding is found by inner product over
+    L2-normalized vectors (cosine similarity, exact search). At most max_entries
+    are kept across all partitions; the oldest are evicted first.
+    """
+
+    def __init__(self, model_name: str, threshold: float, ttl_seconds: int, max_entries: int):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._model = None
+        self._model_lock = threading.Lock()
+        # partition -> {"vectors": (capacity, d) array, "results": [...], "stored_at": [...]}
+        # Only the first len(results) rows of vectors are in use, oldest first
+        self._partitions: Dict[Hashable, Dict[str, Any]] = {}
+        self._size = 0
+
+    def _embed_sync(self, text: str) -> "np.ndarray":
+        # Load the model on first use (in a worker thread, off the event loop)
+        with self._model_lock:
+            if self._model is None:
+                self._model = SentenceTransformer(self.model_name)
+        return self._model.encode(
+            text[:EMBED_MAX_CHARS],
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        ).astype(np.float32)
+
+    async def embed(self, text: str) -> "np.ndarray":
+        """
+        Get the normalized embedding of a resume, from the Redis embedding cache
+        if present, otherwise computed without blocking the event loop.
+
+        Args:
+            text: Resume text
+
+        Returns:
+            np.ndarray: L2-normalized embedding vector
+        """
+        digest = hashlib.sha256(text[:EMBED_MAX_CHARS].encode()).hexdigest()
+        key = f"emb:{self.model_name}:{digest}"
+
+        cached = await get_cached_embedding(key)
+        if cached is not None:
+            return np.frombuffer(cached, dtype=np.float32)
+
+        embedding = await asyncio.to_thread(self._embed_sync, text)
+        await set_cached_embedding(key, embedding.tobytes(), EMBEDDING_CACHE_TTL_SECONDS)
+        return embedding
+
+    def lookup(self, partition: Hashable, embedding: "np.ndarray") -> Optional[Dict[str, Any]]:
+        """
+        Return the cached result of the most similar resume, if it is close enough.
+
+        Args:
+            partition: Exact-match key, e.g. (prompt_version, company, role)
+            embedding: Normalized embedding of the resume being scored
+
+        Returns:
+            Optional[Dict]: Cached scoring result, or None on a miss
+        """
+        entries = self._partitions.get(partition)
+        if not entries:
+            return None
+
+        similarities = entries["vectors"][:len(entries["results"])] @ embedding
+        # Ignore expired entries
+        expired = np.asarray(entries["stored_at"]) < time.time() - self.ttl_seconds
+        similarities[expired] = -1.0
+
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.threshold:
+            return entries["results"][best]
+        return None
+
+    def store(self, partition: Hashable, embedding: "np.ndarray", result: Dict[str, Any]):
+        """
+        Add a validated scoring result to the cache. Expired entries are dropped
+        first, then the oldest ones while the cache is full.
+
+        Args:
+            partition: Exact-match key, e.g. (prompt_version, company, role)
+            embedding: Normalized embedding of the scored resume
+            result: Validated scoring result
+        """
+        now = time.time()
+        self._evict_expired(now)
+        while self._size >= self.max_entries:
+            self._evict_oldest()
+
+        entries = self._partitions.get(partition)
+        if entries is None:
+            entries = self._partitions[partition] = {
+                "vectors": np.empty((8, embedding.shape[0]), dtype=np.float32),
+                "results": [],
+                "stored_at": []
+            }
+
+        count = len(entries["results"])
+        if count == len(entries["vectors"]):
+            # Double the capacity, so inserts copy the array only O(log n) times
+            grown = np.empty((2 * count, entries["vectors"].shape[1]), dtype=np.float32)
+            grown[:count] = entries["vectors"]
+            entries["vectors"] = grown
+
+        entries["vectors"][count] = embedding
+        entries["results"].append(result)
+        entries["stored_at"].append(now)
+        self._size += 1
+
+    def _drop_oldest(self, partition: Hashable, n: int):
+        """
+        Remove the n oldest entries of a partition, and the partition once it is empty.
+        """
+        entries = self._partitions[partition]
+        count = len(entries["results"])
+        if n >= count:
+            del self._partitions[partition]
+        else:
+            vectors = entries["vectors"]
+            vectors[:count - n] = vectors[n:count]
+            del entries["results"][:n]
+            del entries["stored_at"][:n]
+        self._size -= min(n, count)
+
+    def _evict_expired(self, now: float):
+        """
+        Drop entries older than the TTL from every partition.
+        """
+        cutoff = now - self.ttl_seconds
+        for partition, entries in list(self._partitions.items()):
+            # stored_at is in insertion order, so expired entries are a prefix
+            expired = bisect.bisect_left(entries["stored_at"], cutoff)
+            if expired:
+                self._drop_oldest(partition, expired)
+
+    def _evict_oldest(self):
+        """
+        Drop the single oldest entry across all partitions.
+        """
+        partition = min(self._partitions, key=lambda p: self._partitions[p]["stored_at"][0])
+        self._drop_oldest(partition, 1)
+
+_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_checked = False
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """
+    Get the process-wide semantic cache.
+
+    Returns:
+        Optional[SemanticCache]: The cache, or None if disabled or its
+            dependencies are not installed
+    """
+    global _semantic_cache, _semantic_cache_checked
+    if not _semantic_cache_checked:
+        _semantic_cache_checked = True
+        if SEMANTIC_CACHE_ENABLED:
+            if SentenceTransformer is None:
+                print("⚠ SEMANTIC_CACHE_ENABLED is set but numpy/sentence-transformers are not installed")
+            else:
+                _semantic_cache = SemanticCache(
+                    model_name=SEMANTIC_CACHE_MODEL,
+                    threshold=SEMANTIC_CACHE_THRESHOLD,
+                    ttl_seconds=SEMANTIC_CACHE_TTL_SECONDS,
+                    max_entries=SEMANTIC_CACHE_MAX_ENTRIES
+                )
+    return _semantic_cache